@@ -3,32 +3,60 @@ NBA Last 3 Minutes Data Collection (v3)
 DSA 210 - Fall 2025-2026
 
 This script:
-1) Uses nba_api to get all NBA games for selected seasons.
+1) Queries the stats.nba.com leaguegamefinder endpoint (one request per
+   season, asyncio + aiohttp) to get all NBA games for selected seasons.
 2) Uses the NBA liveData play-by-play JSON endpoint (cdn.nba.com)
-   to retrieve detailed play-by-play data for each game.
+   to retrieve detailed play-by-play data for many games concurrently.
+   Raw payloads are cached under data/raw/pbp_cache so re-runs skip HTTP.
 3) Extracts ONLY the last 3 minutes of the 4th quarter plus all overtimes.
-4) Saves a sample of critical moments to data/raw.
+4) Saves a sample of critical moments to data/raw as Parquet.
 """
 
+import asyncio
+import functools
+import json
 import os
+import shutil
+import threading
 import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
+import aiohttp
+import numpy as np
+import orjson
 import pandas as pd
-from nba_api.stats.endpoints import leaguegamefinder
-from nba_api.stats.static import teams
+import pyarrow as pa
+import pyarrow.parquet as pq
 import requests
-from tqdm import tqdm
+from requests.adapters import HTTPAdapter
+from tqdm.asyncio import tqdm_asyncio
+from urllib3.util.retry import Retry
+import zstandard
+
+try:
+    from numba import njit, prange
+
+    HAS_NUMBA = True
+except ImportError:  # optional speedup for clock parsing
+    HAS_NUMBA = False
 
 # ---------------------------------------------------------------------
 # CONFIG
 # ---------------------------------------------------------------------
 
 SEASONS = ["2020-21", "2021-22", "2022-23", "2023-24"]
+LIVE_SEASON = SEASONS[-1]  # cached PBP for this season is revalidated
 
 DATA_DIR = "data"
 RAW_DIR = os.path.join(DATA_DIR, "raw")
 PROCESSED_DIR = os.path.join(DATA_DIR, "processed")
+PBP_CACHE_DIR = os.path.join(RAW_DIR, "pbp_cache")
+
+LEAGUE_GAME_FINDER_URL = "https://stats.nba.com/stats/leaguegamefinder"
+GAME_FINDER_CONCURRENCY = 8  # max in-flight stats.nba.com requests
+PBP_CONCURRENCY = 16  # max in-flight cdn.nba.com requests
+PBP_BATCH_SIZE = 256  # games fetched per batch before streaming to disk
 
 PBP_URL_TEMPLATE = (
     "https://cdn.nba.com/static/json/liveData/playbyplay/playbyplay_{game_id}.json"
@@ -46,6 +74,136 @@ NBA_HEADERS = {
 }
 
 
+# ---------------------------------------------------------------------
+# RATE LIMITING & CONNECTIONS
+# ---------------------------------------------------------------------
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every request to one host.
+
+    Callers reserve a token before each request (sync or async) and report
+    the response back, so Retry-After / X-RateLimit-Remaining headers and
+    429s pause all callers instead of each one backing off on its own.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate  # sustained requests per second
+        self.burst = burst
+        # Caps threads inside a sync request at the bucket's burst size
+        self.semaphore = threading.Semaphore(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take one token and return how long the caller must wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate, self._blocked_until - now)
+
+    def wait(self) -> None:
+        time.sleep(self._reserve())
+
+    async def wait_async(self) -> None:
+        await asyncio.sleep(self._reserve())
+
+    def update_from_headers(self, status: int, headers) -> None:
+        """Pause the bucket when the server asks us to slow down."""
+        delay = 0.0
+        retry_after = headers.get("Retry-After")
+        if retry_after is not None:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                delay = 5.0
+        elif status == 429:
+            delay = 5.0
+        elif headers.get("X-RateLimit-Remaining") == "0":
+            delay = 1.0
+
+        if delay:
+            with self._lock:
+                self._blocked_until = max(
+                    self._blocked_until, time.monotonic() + delay
+                )
+
+
+STATS_LIMITER = RateLimiter(rate=5.0, burst=GAME_FINDER_CONCURRENCY)
+CDN_LIMITER = RateLimiter(rate=20.0, burst=PBP_CONCURRENCY)
+
+
+def _new_session() -> requests.Session:
+    """
+    requests.Session with NBA_HEADERS and a pooled HTTPAdapter, so sync
+    calls reuse TCP/TLS connections and transient 5xx are retried.
+
+    429 is deliberately not retried here: the response must reach
+    rate_limited so the shared RateLimiter pauses on it. For the same
+    reason the final response is returned rather than raised once the
+    retries run out.
+    """
+    session = requests.Session()
+    session.headers.update(NBA_HEADERS)
+    adapter = HTTPAdapter(
+        pool_connections=PBP_CONCURRENCY,
+        pool_maxsize=PBP_CONCURRENCY,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[500, 502, 503, 504],
+            raise_on_status=False,
+        ),
+    )
+    session.mount("https://", adapter)
+    return session
+
+
+# Shared across sync requests so sockets (and TLS sessions) are reused
+SESSION = _new_session()
+
+
+def rate_limited(limiter: RateLimiter):
+    """
+    Decorator for sync functions returning a requests.Response: waits for
+    the limiter before the call and feeds the response headers back to it.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with limiter.semaphore:
+                limiter.wait()
+                resp = func(*args, **kwargs)
+            limiter.update_from_headers(resp.status_code, resp.headers)
+            return resp
+
+        return wrapper
+
+    return decorator
+
+
+@rate_limited(CDN_LIMITER)
+def _cdn_get(url: str, **kwargs) -> requests.Response:
+    """GET against cdn.nba.com through the shared SESSION."""
+    global SESSION
+    try:
+        return SESSION.get(url, timeout=15, **kwargs)
+    except requests.Timeout:
+        # A timed-out keep-alive socket can leave the pool wedged
+        # (known nba_api issue); drop all connections and start fresh.
+        SESSION.close()
+        SESSION = _new_session()
+        raise
+
+
 # ---------------------------------------------------------------------
 # HELPER FUNCTIONS
 # ---------------------------------------------------------------------
@@ -59,35 +217,90 @@ def ensure_directories() -> None:
             print(f"Created directory: {path}")
 
 
+async def fetch_season_games(
+    session: aiohttp.ClientSession,
+    season: str,
+    semaphore: asyncio.Semaphore,
+    max_retries: int = 3,
+) -> pd.DataFrame:
+    """
+    Fetch the regular season game log of every team for one season with a
+    single request to the stats.nba.com leaguegamefinder endpoint.
+    Each game appears twice (once per team). Transient failures are
+    retried with backoff; the last attempt's error is raised.
+    """
+    params = {
+        "PlayerOrTeam": "T",
+        "Season": season,
+        "SeasonType": "Regular Season",
+        "LeagueID": "00",
+    }
+
+    for attempt in range(1, max_retries + 1):
+        try:
+            async with semaphore:
+                await STATS_LIMITER.wait_async()
+                async with session.get(
+                    LEAGUE_GAME_FINDER_URL,
+                    params=params,
+                    timeout=aiohttp.ClientTimeout(total=30),
+                ) as resp:
+                    STATS_LIMITER.update_from_headers(resp.status, resp.headers)
+                    resp.raise_for_status()
+                    data = orjson.loads(await resp.read())
+            break
+
+        except Exception as exc:
+            if attempt == max_retries:
+                raise
+            print(
+                f"Error retrieving games for {season} "
+                f"(attempt {attempt}/{max_retries}): {exc}"
+            )
+            # back off outside the semaphore so the slot is freed
+            await asyncio.sleep(1.0 * attempt)
+
+    result = data["resultSets"][0]
+    return pd.DataFrame(result["rowSet"], columns=result["headers"])
+
+
+async def _fetch_all_seasons(
+    seasons: list[str],
+) -> list[pd.DataFrame | BaseException]:
+    """
+    Dispatch one request per season concurrently, bounded by
+    GAME_FINDER_CONCURRENCY. Failures are returned in place of frames.
+    """
+    semaphore = asyncio.Semaphore(GAME_FINDER_CONCURRENCY)
+
+    connector = aiohttp.TCPConnector(limit_per_host=GAME_FINDER_CONCURRENCY)
+    async with aiohttp.ClientSession(
+        headers=NBA_HEADERS, connector=connector
+    ) as session:
+        tasks = [
+            fetch_season_games(session, season, semaphore) for season in seasons
+        ]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+
 def get_all_games(seasons: list[str]) -> pd.DataFrame:
     """
     Retrieve all unique regular season games for the given seasons
-    using LeagueGameFinder.
+    using one leaguegamefinder request per season.
     """
     print(f"Collecting games for seasons: {seasons}")
     all_games = []
 
-    nba_teams = teams.get_teams()
+    results = asyncio.run(_fetch_all_seasons(seasons))
 
-    for season in seasons:
+    for season, season_df in zip(seasons, results):
         print(f"\nSeason: {season}")
-        season_games = []
 
-        for team in tqdm(nba_teams, desc=f"Teams in {season}"):
-            try:
-                gf = leaguegamefinder.LeagueGameFinder(
-                    team_id_nullable=team["id"],
-                    season_nullable=season,
-                    season_type_nullable="Regular Season",
-                )
-                df = gf.get_data_frames()[0]
-                season_games.append(df)
-                time.sleep(0.4)  # rate limiting
-            except Exception as exc:
-                print(f"Error for team {team['full_name']} in {season}: {exc}")
-
-        if season_games:
-            season_df = pd.concat(season_games, ignore_index=True)
+        if isinstance(season_df, BaseException):
+            print(f"Error for season {season}: {season_df}")
+            continue
+
+        if not season_df.empty:
             season_df = season_df.drop_duplicates(subset=["GAME_ID"])
             print(f"  Unique games in {season}: {len(season_df)}")
             all_games.append(season_df)
@@ -133,29 +346,287 @@ def clock_to_seconds(clock_str: str) -> int:
         return 0
 
 
-def fetch_pbp_live(game_id: str, max_retries: int = 3) -> pd.DataFrame:
+if HAS_NUMBA:
+
+    @njit(parallel=True, cache=True)
+    def _clock_kernel(buf: np.ndarray) -> np.ndarray:
+        """
+        Parse a (n_rows, width) uint8 buffer of ASCII clock strings
+        (NUL-padded) into seconds. Agrees with clock_to_seconds on the
+        canonical 'PT#M#.##S', 'MM:SS' and unsigned-number formats; other
+        shapes (signs, exponents, fractional minutes) parse to 0.
+        """
+        n, width = buf.shape
+        out = np.zeros(n, dtype=np.int32)
+
+        for i in prange(n):
+            row = buf[i]
+            length = 0
+            while length < width and row[length] != 0:
+                length += 1
+            if length == 0:
+                continue
+
+            # ISO8601 'PT#M#S': rounded
+            if length >= 2 and row[0] == 80 and row[1] == 84:  # 'P', 'T'
+                minutes = 0.0
+                seconds = 0.0
+                num = 0.0
+                scale = 0.0
+                for j in range(2, length):
+                    c = row[j]
+                    if 48 <= c <= 57:  # digit
+                        if scale == 0.0:
+                            num = num * 10.0 + (c - 48)
+                        else:
+                            num += (c - 48) * scale
+                            scale /= 10.0
+                    elif c == 46 and scale == 0.0:  # '.'
+                        scale = 0.1
+                    elif c == 77 and scale == 0.0:  # 'M'
+                        minutes = num
+                        num = 0.0
+                    elif c == 83:  # 'S'
+                        seconds = num
+                        break
+                    else:
+                        break
+                out[i] = np.int32(np.rint(minutes * 60.0 + seconds))
+                continue
+
+            # 'MM:SS' or plain number: truncated
+            whole = 0
+            frac_seen = False
+            minutes_int = -1
+            valid = True
+            has_digit = False
+            for j in range(length):
+                c = row[j]
+                if 48 <= c <= 57:
+                    if not frac_seen:
+                        whole = whole * 10 + (c - 48)
+                    has_digit = True
+                elif c == 46 and not frac_seen:  # '.'
+                    frac_seen = True
+                elif c == 58 and minutes_int < 0 and not frac_seen:  # ':'
+                    if not has_digit:
+                        valid = False
+                        break
+                    minutes_int = whole
+                    whole = 0
+                    has_digit = False
+                else:
+                    valid = False
+                    break
+            if not valid or not has_digit:
+                continue
+            if minutes_int >= 0:
+                out[i] = minutes_int * 60 + whole
+            else:
+                out[i] = whole
+
+        return out
+
+
+def clock_to_seconds_batch(clock: pd.Series) -> pd.Series:
+    """
+    Numba-compiled clock parser for large frames (requires numba).
+    Strings must be ASCII; raises UnicodeEncodeError otherwise.
+    """
+    clock = clock.astype(str).str.strip()
+    buf = clock.to_numpy(dtype=object).astype(np.bytes_)
+    width = max(buf.dtype.itemsize, 1)
+    view = np.frombuffer(buf.tobytes(), dtype=np.uint8).reshape(len(buf), width)
+    return pd.Series(_clock_kernel(view), index=clock.index)
+
+
+def clock_series_to_seconds(clock: pd.Series) -> pd.Series:
+    """
+    clock_to_seconds for a whole Series of clock strings; unparseable
+    values map to 0. Uses clock_to_seconds_batch when numba is installed,
+    so results are only guaranteed to match on canonical clock formats
+    (see _clock_kernel).
+    """
+    if HAS_NUMBA:
+        try:
+            return clock_to_seconds_batch(clock)
+        except UnicodeEncodeError:
+            pass
+
+    # Parse each distinct string once with the scalar parser: a game's
+    # few dozen rows are cheaper to loop over directly than to hash, and
+    # whole seasons repeat the same few hundred clock values.
+    clock = clock.astype(str)
+    if len(clock) < 1000:
+        codes, values = None, clock.to_numpy(dtype=object)
+    else:
+        codes, values = pd.factorize(clock, use_na_sentinel=False)
+    secs = np.fromiter((_fast_clock(c) for c in values), np.int32, len(values))
+    if codes is not None:
+        secs = secs[codes]
+    return pd.Series(secs, index=clock.index)
+
+
+def _fast_clock(clock_str: str) -> int:
+    """
+    Pure-Python clock parser for filtering raw JSON actions. Handles the
+    usual 'PT02M34.00S' shape directly and defers to clock_to_seconds for
+    anything else.
+    """
+    if clock_str.startswith("PT") and clock_str.endswith("S"):
+        minutes, sep, seconds = clock_str[2:-1].partition("M")
+        if sep:
+            try:
+                return int(round(int(minutes) * 60 + float(seconds)))
+            except ValueError:
+                pass
+    return clock_to_seconds(clock_str)
+
+
+def is_critical_action(action: dict) -> bool:
+    """True for actions in the last 3 minutes of Q4 or in any overtime."""
+    period = action.get("period") or 0
+    if period > 4:
+        return True
+    return period == 4 and _fast_clock(action.get("clock") or "") <= 180
+
+
+def pbp_json_to_frame(
+    data: dict, game_id: str, critical_only: bool = True
+) -> pd.DataFrame:
+    """
+    Turn a liveData play-by-play JSON payload into a DataFrame with one
+    row per action/event.
+
+    With critical_only (the default) actions outside the last 3 minutes
+    of Q4 + OT are dropped before the DataFrame is built, so only ~1 in 10
+    rows is ever materialized.
+    """
+    actions = data.get("game", {}).get("actions", [])
+
+    if critical_only:
+        actions = [a for a in actions if is_critical_action(a)]
+
+    if not actions:
+        return pd.DataFrame()
+
+    df = pd.DataFrame(actions)
+    df["GAME_ID"] = game_id
+    return df
+
+
+def _pbp_cache_paths(game_id: str) -> tuple[str, str]:
+    """Return (payload, sidecar) cache paths for a game."""
+    base = os.path.join(PBP_CACHE_DIR, game_id)
+    return f"{base}.json.zst", f"{base}.meta.json"
+
+
+def load_cached_pbp(game_id: str) -> tuple[bytes, dict] | None:
+    """
+    Load a cached raw PBP payload and its metadata sidecar.
+    Returns None on a cache miss.
+    """
+    payload_path, meta_path = _pbp_cache_paths(game_id)
+    if not os.path.exists(payload_path):
+        return None
+
+    with open(payload_path, "rb") as f:
+        content = zstandard.ZstdDecompressor().decompress(f.read())
+
+    meta = {}
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+    return content, meta
+
+
+def store_cached_pbp(game_id: str, content: bytes, etag: str | None) -> None:
+    """
+    Write a raw PBP payload (zstd-compressed) plus an ETag/timestamp
+    sidecar to the cache directory. A body that later fails to decode is
+    evicted with drop_cached_pbp, so a bad response never poisons the cache.
+    """
+    os.makedirs(PBP_CACHE_DIR, exist_ok=True)
+    payload_path, meta_path = _pbp_cache_paths(game_id)
+
+    tmp_path = f"{payload_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(zstandard.ZstdCompressor().compress(content))
+    os.replace(tmp_path, payload_path)
+
+    with open(meta_path, "w") as f:
+        json.dump({"_etag": etag, "fetched_at": datetime.now().isoformat()}, f)
+
+
+def drop_cached_pbp(game_id: str) -> None:
+    """Remove a game's cached payload and sidecar (e.g. after a bad decode)."""
+    for path in _pbp_cache_paths(game_id):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def needs_revalidation(game_id: str) -> bool:
+    """
+    Games from past seasons never change, so their cached payloads are
+    served as-is. Only games of LIVE_SEASON are revalidated with the server.
+
+    NBA game IDs encode the season start year in characters 3-4,
+    e.g. '0022300001' -> 2023-24.
+    """
+    return game_id[3:5] == LIVE_SEASON[2:4]
+
+
+def _conditional_headers(cached: tuple[bytes, dict] | None) -> dict:
+    """
+    Extra headers for a (possibly conditional) GET of a PBP payload.
+    NBA_HEADERS are already set on both the sync and async sessions.
+    """
+    headers = {}
+    if cached is not None and cached[1].get("_etag"):
+        headers["If-None-Match"] = cached[1]["_etag"]
+    return headers
+
+
+def fetch_pbp_live(
+    game_id: str, max_retries: int = 3, critical_only: bool = True
+) -> pd.DataFrame:
     """
     Fetch play-by-play data from NBA liveData endpoint for a single game.
+    The on-disk cache is checked before the network.
 
-    Returns a DataFrame with one row per action/event.
+    Returns a DataFrame with one row per action/event; with critical_only
+    only the last 3 minutes of Q4 + OT are kept (see pbp_json_to_frame).
     """
+    cached = load_cached_pbp(game_id)
+    cached_data = None
+    if cached is not None:
+        try:
+            cached_data = orjson.loads(cached[0])
+        except orjson.JSONDecodeError:
+            print(f"  Dropping undecodable cached PBP for {game_id}")
+            drop_cached_pbp(game_id)
+            cached = None
+
+    if cached is not None and not needs_revalidation(game_id):
+        return pbp_json_to_frame(cached_data, game_id, critical_only)
+
     url = PBP_URL_TEMPLATE.format(game_id=game_id)
+    headers = _conditional_headers(cached)
 
     for attempt in range(1, max_retries + 1):
         try:
-            resp = requests.get(url, headers=NBA_HEADERS, timeout=15)
-            resp.raise_for_status()
-
-            data = resp.json()
-            actions = data.get("game", {}).get("actions", [])
+            resp = _cdn_get(url, headers=headers)
 
-            if not actions:
-                print(f"  No actions found for game {game_id}")
-                return pd.DataFrame()
+            if resp.status_code == 304:
+                data = cached_data
+            else:
+                resp.raise_for_status()
+                data = orjson.loads(resp.content)
+                store_cached_pbp(game_id, resp.content, resp.headers.get("ETag"))
 
-            df = pd.DataFrame(actions)
-            df["GAME_ID"] = game_id
-            return df
+            return pbp_json_to_frame(data, game_id, critical_only)
 
         except Exception as exc:
             print(
@@ -167,114 +638,302 @@ def fetch_pbp_live(game_id: str, max_retries: int = 3) -> pd.DataFrame:
     return pd.DataFrame()
 
 
+async def fetch_pbp_live_async(
+    session: aiohttp.ClientSession,
+    game_id: str,
+    semaphore: asyncio.Semaphore,
+    max_retries: int = 3,
+) -> bytes | None:
+    """
+    Async variant of fetch_pbp_live used by extract_critical_moments.
+
+    Returns the raw (undecoded) liveData JSON bytes, or None if every
+    attempt failed. Decoding (orjson) is left to the worker processes.
+    Cache hits return immediately without taking a semaphore slot.
+    """
+    cached = load_cached_pbp(game_id)
+    if cached is not None and not needs_revalidation(game_id):
+        return cached[0]
+
+    url = PBP_URL_TEMPLATE.format(game_id=game_id)
+    headers = _conditional_headers(cached)
+
+    for attempt in range(1, max_retries + 1):
+        try:
+            async with semaphore:
+                await CDN_LIMITER.wait_async()
+                async with session.get(
+                    url, headers=headers, timeout=aiohttp.ClientTimeout(total=15)
+                ) as resp:
+                    CDN_LIMITER.update_from_headers(resp.status, resp.headers)
+                    if resp.status == 304:
+                        content = cached[0]
+                    else:
+                        resp.raise_for_status()
+                        content = await resp.read()
+                        store_cached_pbp(
+                            game_id, content, resp.headers.get("ETag")
+                        )
+            return content
+
+        except Exception as exc:
+            print(
+                f"Error retrieving PBP for {game_id} "
+                f"(attempt {attempt}/{max_retries}): {exc}"
+            )
+            # back off outside the semaphore so the slot is freed
+            await asyncio.sleep(1.0 * attempt)
+
+    return None
+
+
+async def _fetch_all_pbp(game_ids: list[str]) -> list[bytes | None]:
+    """
+    Fetch play-by-play payloads for all games concurrently, bounded by
+    PBP_CONCURRENCY. Results are returned in the same order as game_ids.
+    """
+    semaphore = asyncio.Semaphore(PBP_CONCURRENCY)
+
+    connector = aiohttp.TCPConnector(limit_per_host=PBP_CONCURRENCY)
+    async with aiohttp.ClientSession(
+        headers=NBA_HEADERS, connector=connector
+    ) as session:
+        tasks = [
+            fetch_pbp_live_async(session, game_id, semaphore)
+            for game_id in game_ids
+        ]
+        return await tqdm_asyncio.gather(*tasks, desc="Games")
+
+
 def extract_last_3_minutes(pbp_df: pd.DataFrame) -> pd.DataFrame:
     """
     Filter play-by-play to:
       - last 3 minutes of the 4th quarter
       - all overtime periods (PERIOD > 4)
     Also compute score differential and time remaining.
+
+    Pure (no printing, no input mutation) so it can run in worker processes.
     """
     if pbp_df.empty:
         return pbp_df
 
-    df = pbp_df.copy()
-
     # Ensure required columns exist
     # liveData typically uses 'period', 'clock', 'homeScore', 'awayScore'
-    if "period" not in df.columns or "clock" not in df.columns:
-        print("  Warning: period/clock columns missing in PBP data.")
+    if "period" not in pbp_df.columns or "clock" not in pbp_df.columns:
         return pd.DataFrame()
 
+    # Cheap period filter first, so the clock is only parsed for Q4 + OT
+    late = pbp_df.loc[pbp_df["period"] >= 4]
+
     # Convert clock to seconds remaining in the period
-    df["time_remaining"] = df["clock"].apply(clock_to_seconds)
+    time_remaining = clock_series_to_seconds(late["clock"])
+
+    # Last 3 minutes of 4th quarter + all overtimes
+    mask_last3_q4 = (late["period"] == 4) & (time_remaining <= 180)
+    mask_ot = late["period"] > 4
+    mask = mask_last3_q4 | mask_ot
+
+    # Only the surviving subset is copied and gets derived columns
+    critical = late.loc[mask].copy()
+    critical["time_remaining"] = time_remaining[mask]
 
     # Score differential (home - away)
     home_col = "homeScore"
     away_col = "awayScore"
-    if home_col in df.columns and away_col in df.columns:
-        df[home_col] = df[home_col].fillna(0).astype(int)
-        df[away_col] = df[away_col].fillna(0).astype(int)
-        df["score_diff"] = df[home_col] - df[away_col]
+    if home_col in critical.columns and away_col in critical.columns:
+        critical[home_col] = critical[home_col].fillna(0).astype(int)
+        critical[away_col] = critical[away_col].fillna(0).astype(int)
+        # NBA scores fit comfortably in int16
+        critical[[home_col, away_col]] = critical[[home_col, away_col]].astype(
+            "int16"
+        )
+        critical["score_diff"] = critical[home_col] - critical[away_col]
     else:
-        df["score_diff"] = 0
-
-    # Last 3 minutes of 4th quarter + all overtimes
-    mask_last3_q4 = (df["period"] == 4) & (df["time_remaining"] <= 180)
-    mask_ot = df["period"] > 4
-    critical = df[mask_last3_q4 | mask_ot].copy()
+        critical["score_diff"] = 0
+    critical["score_diff"] = critical["score_diff"].astype("int16")
+    critical["period"] = critical["period"].astype("int8")
 
     return critical
 
 
 def save_dataframe(df: pd.DataFrame, filename: str) -> None:
-    """Save DataFrame to CSV and pickle under data/raw."""
+    """Save DataFrame to zstd-compressed Parquet under data/raw."""
     if df.empty:
         print(f"DataFrame '{filename}' is empty. Nothing to save.")
         return
 
-    csv_path = os.path.join(RAW_DIR, f"{filename}.csv")
-    pkl_path = os.path.join(RAW_DIR, f"{filename}.pkl")
+    parquet_path = os.path.join(RAW_DIR, f"{filename}.parquet")
+
+    df.to_parquet(parquet_path, compression="zstd", index=False)
+
+    print(f"Saved Parquet: {parquet_path}")
+
+
+def _conform_table(table: pa.Table, schema: pa.Schema) -> pa.Table:
+    """
+    Cast a per-batch table to the unified schema, filling columns the
+    batch never saw with nulls.
+    """
+    columns = []
+    for field in schema:
+        if field.name in table.column_names:
+            columns.append(table.column(field.name).cast(field.type))
+        else:
+            columns.append(pa.nulls(len(table), type=field.type))
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def _process_one_game(job: tuple[bytes, str, str, str]) -> pd.DataFrame | None:
+    """
+    Decode, filter and annotate one game's raw PBP payload.
+    Runs in a ProcessPoolExecutor worker, so it must stay picklable.
+    Returns None if the payload is not valid JSON (so the parent can drop
+    the cache entry) and an empty DataFrame if processing fails.
+    """
+    content, game_id, game_date, matchup = job
+
+    # A bad payload must not take the whole run down: the parent counts an
+    # empty result as a skipped game.
+    try:
+        data = orjson.loads(content)
+    except orjson.JSONDecodeError as exc:
+        print(f"  Undecodable PBP payload for game {game_id}: {exc}")
+        return None
 
-    df.to_csv(csv_path, index=False)
-    df.to_pickle(pkl_path)
+    try:
+        pbp_raw = pbp_json_to_frame(data, game_id)
+        critical = extract_last_3_minutes(pbp_raw)
+    except Exception as exc:
+        print(f"  Error processing game {game_id}: {exc}")
+        return pd.DataFrame()
+    if critical.empty:
+        return critical
 
-    print(f"Saved CSV  : {csv_path}")
-    print(f"Saved PKL  : {pkl_path}")
+    # Attach metadata
+    critical["GAME_DATE"] = game_date
+    critical["MATCHUP"] = matchup
+    return critical
 
 
 def extract_critical_moments(
-    games_df: pd.DataFrame, limit: int | None = 100
-) -> pd.DataFrame:
+    games_df: pd.DataFrame, output_path: str, limit: int | None = 100
+) -> int:
     """
     For a set of games, fetch play-by-play and extract critical moments.
 
+    Payloads are fetched asynchronously, decoded and filtered in a process
+    pool, and each batch of PBP_BATCH_SIZE games is spilled to a part file
+    before being merged into a single Parquet file, so memory stays bounded
+    by one batch.
+
     Parameters
     ----------
     games_df : DataFrame
         Output of get_all_games().
+    output_path : str
+        Parquet file the critical moments are written to.
     limit : int or None
         Number of games to process (for experimentation).
         Use None to process all games (can be very slow).
+
+    Returns the number of critical events written.
     """
     if games_df.empty:
-        return pd.DataFrame()
+        return 0
 
     if limit is not None:
         games_df = games_df.head(limit)
 
     print(f"\nExtracting critical moments from {len(games_df)} games...")
 
-    all_critical = []
-
-    for _, game_row in tqdm(
-        games_df.iterrows(), total=len(games_df), desc="Games"
-    ):
-        game_id = game_row["GAME_ID"]
+    # Each batch is spilled to its own part file while the schema is
+    # unified across games ("permissive" promotion: columns that show up
+    # later are added, null / list<null> columns take the type seen
+    # elsewhere, int columns only widen to float if a game has floats).
+    # The parts are then cast to the final schema and merged.
+    part_dir = f"{output_path}.parts"
+    os.makedirs(part_dir, exist_ok=True)
+    part_paths = []
+    schema = None
+    n_events = 0
+    n_skipped = 0
 
-        pbp_raw = fetch_pbp_live(game_id)
-        if pbp_raw.empty:
-            continue
-
-        critical = extract_last_3_minutes(pbp_raw)
-        if critical.empty:
-            continue
-
-        # Attach metadata
-        critical["GAME_DATE"] = game_row["GAME_DATE"]
-        critical["MATCHUP"] = game_row["MATCHUP"]
-
-        all_critical.append(critical)
-
-        # be nice to the API
-        time.sleep(0.3)
-
-    if not all_critical:
+    try:
+        with ProcessPoolExecutor() as executor:
+            for start in range(0, len(games_df), PBP_BATCH_SIZE):
+                batch = games_df.iloc[start : start + PBP_BATCH_SIZE]
+                payloads = asyncio.run(_fetch_all_pbp(batch["GAME_ID"].tolist()))
+
+                jobs = [
+                    (content, game_id, game_date, matchup)
+                    for game_id, game_date, matchup, content in zip(
+                        batch["GAME_ID"].to_numpy(),
+                        batch["GAME_DATE"].to_numpy(),
+                        batch["MATCHUP"].to_numpy(),
+                        payloads,
+                    )
+                    if content is not None
+                ]
+                results = executor.map(_process_one_game, jobs, chunksize=8)
+
+                tables = []
+                for (_, game_id, _, _), critical in zip(jobs, results):
+                    if critical is None:
+                        # Don't serve the same bad payload on the next run
+                        drop_cached_pbp(game_id)
+                        n_skipped += 1
+                        continue
+                    if critical.empty:
+                        n_skipped += 1
+                        continue
+
+                    try:
+                        table = pa.Table.from_pandas(
+                            critical, preserve_index=False
+                        ).replace_schema_metadata(None)
+                        schema = (
+                            table.schema
+                            if schema is None
+                            else pa.unify_schemas(
+                                [schema, table.schema],
+                                promote_options="permissive",
+                            )
+                        )
+                    except pa.ArrowException as exc:
+                        print(f"  Skipping game {game_id}: schema mismatch ({exc})")
+                        continue
+
+                    tables.append(table)
+                    n_events += len(critical)
+
+                if tables:
+                    part_path = os.path.join(part_dir, f"{len(part_paths):05d}.parquet")
+                    pq.write_table(
+                        pa.concat_tables(tables, promote_options="permissive"),
+                        part_path,
+                        compression="zstd",
+                    )
+                    part_paths.append(part_path)
+
+        if schema is not None:
+            with pq.ParquetWriter(output_path, schema, compression="zstd") as writer:
+                for part_path in part_paths:
+                    writer.write_table(
+                        _conform_table(pq.read_table(part_path), schema)
+                    )
+    finally:
+        shutil.rmtree(part_dir, ignore_errors=True)
+
+    if n_skipped:
+        print(f"  {n_skipped} games had no usable critical-time events.")
+
+    if schema is None:
         print("No critical moments extracted.")
-        return pd.DataFrame()
+        return 0
 
-    critical_df = pd.concat(all_critical, ignore_index=True)
-    print(f"\nTotal critical events collected: {len(critical_df)}")
-    return critical_df
+    print(f"\nTotal critical events collected: {n_events}")
+    print(f"Saved Parquet: {output_path}")
+    return n_events
 
 
 # ---------------------------------------------------------------------
@@ -303,12 +962,11 @@ def main() -> None:
 
     # Step 2: critical moments
     print("\nStep 2: Extracting critical moments (last 3 minutes + OT)...")
-    critical_df = extract_critical_moments(games_df, limit=100)
-
-    if not critical_df.empty:
-        filename = f"critical_moments_sample_{datetime.now().strftime('%Y%m%d')}"
-        save_dataframe(critical_df, filename)
+    filename = f"critical_moments_sample_{datetime.now().strftime('%Y%m%d')}"
+    output_path = os.path.join(RAW_DIR, f"{filename}.parquet")
+    n_events = extract_critical_moments(games_df, output_path, limit=100)
 
+    if n_events:
         print("\nSample preview:\n")
         preview_cols = [
             "GAME_ID",
@@ -322,8 +980,10 @@ def main() -> None:
             "score_diff",
             "description",
         ]
-        existing_cols = [c for c in preview_cols if c in critical_df.columns]
-        print(critical_df[existing_cols].head(10))
+        available = pq.read_schema(output_path).names
+        existing_cols = [c for c in preview_cols if c in available]
+        preview = pq.ParquetFile(output_path).read_row_group(0, columns=existing_cols)
+        print(preview.to_pandas().head(10))
 
     print("\nData collection complete.\n")
 
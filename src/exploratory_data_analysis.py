@@ -7,17 +7,22 @@ This script performs EDA on the critical moments dataset created by
 data_collection.py (v3), which uses the NBA liveData JSON endpoint.
 
 It:
-- Loads the latest critical_moments_sample_*.csv from data/raw
+- Loads the latest critical_moments_sample_*.parquet from data/raw
 - Computes basic summaries and derived features
 - Produces visualizations and saves them to figures/
 - Saves an enhanced processed dataset to data/processed/
 - Generates a simple text EDA report
 """
 
+import argparse
 import os
 import glob
 import warnings
 
+import matplotlib
+
+matplotlib.use("Agg")  # headless: files only, no GUI backend start-up
+
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
@@ -29,6 +34,18 @@ warnings.filterwarnings("ignore")
 RAW_DIR = "data/raw"
 PROCESSED_DIR = "data/processed"
 FIGURES_DIR = "figures"
+FIGURE_DPI = 150  # override with --dpi
+
+# Score differential buckets (home - away), right-closed like pd.cut
+SCORE_BUCKET_EDGES = np.array([-20, -6, -3, 0, 3, 6, 20])
+SCORE_BUCKET_LABELS = [
+    "Home -7+",
+    "Home -4 to -6",
+    "Home -1 to -3",
+    "Tied",
+    "Home +1 to +3",
+    "Home +4+",
+]
 
 
 # ---------------------------------------------------------------------
@@ -36,6 +53,22 @@ FIGURES_DIR = "figures"
 # ---------------------------------------------------------------------
 
 
+def reset_axes(fig: plt.Figure, figsize: tuple[float, float]) -> plt.Axes:
+    """
+    Clear the shared figure (including colorbars) and return a fresh Axes
+    at the requested size. All plots reuse a single Figure created in main().
+    """
+    fig.clear()
+    fig.set_size_inches(*figsize)
+    return fig.add_subplot()
+
+
+def save_figure(fig: plt.Figure, filename: str) -> None:
+    """Save the shared figure to figures/ at the figure's own dpi."""
+    fig.tight_layout()
+    fig.savefig(os.path.join(FIGURES_DIR, filename), dpi=fig.dpi)
+
+
 def ensure_directories() -> None:
     """Make sure output directories exist."""
     for folder in [PROCESSED_DIR, FIGURES_DIR]:
@@ -45,13 +78,18 @@ def ensure_directories() -> None:
 
 def load_latest_critical_data() -> pd.DataFrame | None:
     """
-    Load the most recent critical_moments_sample_*.csv file from data/raw.
+    Load the most recent critical_moments_sample_*.parquet file from data/raw.
+    Falls back to legacy CSV samples if no Parquet file exists.
     """
-    pattern = os.path.join(RAW_DIR, "critical_moments_sample_*.csv")
-    files = glob.glob(pattern)
+    files = glob.glob(os.path.join(RAW_DIR, "critical_moments_sample_*.parquet"))
+    if files:
+        latest_file = max(files, key=os.path.getmtime)
+        print(f"Loading data from: {latest_file}")
+        return pd.read_parquet(latest_file)
 
+    files = glob.glob(os.path.join(RAW_DIR, "critical_moments_sample_*.csv"))
     if not files:
-        print("No critical_moments_sample_*.csv files found in data/raw.")
+        print("No critical_moments_sample_* files found in data/raw.")
         print("Please run data_collection.py first.")
         return None
 
@@ -91,8 +129,11 @@ def add_time_bins(df: pd.DataFrame) -> pd.DataFrame:
     """
     Create time bin categories for analysis.
     Assumes time_remaining is in seconds.
+
+    Idempotent: if time_bin already exists it is reused, so main() can
+    bin once and every analysis reads the same column.
     """
-    if "time_remaining" not in df.columns:
+    if "time_remaining" not in df.columns or "time_bin" in df.columns:
         return df
 
     df["time_bin"] = pd.cut(
@@ -109,9 +150,10 @@ def add_time_bins(df: pd.DataFrame) -> pd.DataFrame:
 # ---------------------------------------------------------------------
 
 
-def temporal_analysis(df: pd.DataFrame) -> None:
+def temporal_analysis(df: pd.DataFrame, fig: plt.Figure) -> None:
     """
     Temporal analysis of events over the last 3 minutes.
+    Expects add_time_bins() to have been applied.
     """
     print("\n====================================")
     print("TEMPORAL ANALYSIS")
@@ -121,32 +163,24 @@ def temporal_analysis(df: pd.DataFrame) -> None:
         print("time_remaining column not found; skipping temporal analysis.")
         return
 
-    df = add_time_bins(df)
-
     # Event count by time bin
-    plt.figure(figsize=(10, 5))
+    ax = reset_axes(fig, (10, 5))
     counts = df["time_bin"].value_counts().sort_index()
-    counts.plot(kind="bar")
-    plt.title("Event Count by Time Bin (Last 3 Minutes + OT)")
-    plt.xlabel("Time Bin")
-    plt.ylabel("Number of Events")
-    plt.tight_layout()
-    plt.savefig(os.path.join(FIGURES_DIR, "temporal_event_counts.png"), dpi=300)
-    plt.close()
+    counts.plot(kind="bar", ax=ax)
+    ax.set_title("Event Count by Time Bin (Last 3 Minutes + OT)")
+    ax.set_xlabel("Time Bin")
+    ax.set_ylabel("Number of Events")
+    save_figure(fig, "temporal_event_counts.png")
 
     # Score differential vs time
     if "score_diff" in df.columns:
-        plt.figure(figsize=(10, 5))
-        plt.scatter(df["time_remaining"], df["score_diff"], alpha=0.3, s=5)
-        plt.axhline(0, color="red", linestyle="--", alpha=0.5)
-        plt.title("Score Differential vs Time Remaining")
-        plt.xlabel("Time Remaining (seconds)")
-        plt.ylabel("Score Differential (home - away)")
-        plt.tight_layout()
-        plt.savefig(
-            os.path.join(FIGURES_DIR, "score_diff_over_time.png"), dpi=300
-        )
-        plt.close()
+        ax = reset_axes(fig, (10, 5))
+        ax.scatter(df["time_remaining"], df["score_diff"], alpha=0.3, s=5)
+        ax.axhline(0, color="red", linestyle="--", alpha=0.5)
+        ax.set_title("Score Differential vs Time Remaining")
+        ax.set_xlabel("Time Remaining (seconds)")
+        ax.set_ylabel("Score Differential (home - away)")
+        save_figure(fig, "score_diff_over_time.png")
 
         print("\nTemporal summary:")
         print(f"- Average score differential: {df['score_diff'].mean():.2f}")
@@ -160,7 +194,7 @@ def temporal_analysis(df: pd.DataFrame) -> None:
 # ---------------------------------------------------------------------
 
 
-def shot_selection_analysis(df: pd.DataFrame) -> None:
+def shot_selection_analysis(df: pd.DataFrame, fig: plt.Figure) -> None:
     """
     Analyze shot selection in clutch time using liveData fields:
     - actionType (shot, freeThrow, etc.)
@@ -199,26 +233,26 @@ def shot_selection_analysis(df: pd.DataFrame) -> None:
 
     shots["actionType"] = shots["actionType"].astype(str).str.lower()
 
-    def classify_shot(row) -> str:
-        t = row.get("shotType", "")
-        a = row.get("actionType", "")
-        if "3" in t:
-            return "3PT"
-        if a in ["freethrow", "freeThrow"] or "ft" in t or "free" in t:
-            return "FT"
-        return "2PT"
+    # Low-cardinality labels: category dtype makes the comparisons and
+    # value_counts below operate on integer codes.
+    for col in ["actionType", "shotType", "shotResult"]:
+        shots[col] = shots[col].astype("category")
 
-    shots["shot_category"] = shots.apply(classify_shot, axis=1)
+    t = shots["shotType"]
+    a = shots["actionType"]
+    conds = [
+        t.str.contains("3", regex=False),
+        a.isin(["freethrow", "freeThrow"]) | t.str.contains("ft|free", case=False),
+    ]
+    shots["shot_category"] = np.select(conds, ["3PT", "FT"], default="2PT")
 
     # Overall distribution
-    plt.figure(figsize=(6, 6))
+    ax = reset_axes(fig, (6, 6))
     counts = shots["shot_category"].value_counts()
-    counts.plot(kind="pie", autopct="%1.1f%%")
-    plt.ylabel("")
-    plt.title("Shot Type Distribution (Last 3 Minutes + OT)")
-    plt.tight_layout()
-    plt.savefig(os.path.join(FIGURES_DIR, "shot_type_distribution.png"), dpi=300)
-    plt.close()
+    counts.plot(kind="pie", autopct="%1.1f%%", ax=ax)
+    ax.set_ylabel("")
+    ax.set_title("Shot Type Distribution (Last 3 Minutes + OT)")
+    save_figure(fig, "shot_type_distribution.png")
 
     print("\nShot type counts:")
     print(counts)
@@ -229,9 +263,10 @@ def shot_selection_analysis(df: pd.DataFrame) -> None:
 # ---------------------------------------------------------------------
 
 
-def heatmap_game_states(df: pd.DataFrame) -> None:
+def heatmap_game_states(df: pd.DataFrame, fig: plt.Figure) -> None:
     """
     Heatmap of how often different (time, score_diff) game states occur.
+    Expects add_time_bins() to have been applied.
     """
     print("\n====================================")
     print("GAME STATE HEATMAP")
@@ -241,40 +276,52 @@ def heatmap_game_states(df: pd.DataFrame) -> None:
         print("time_remaining or score_diff missing; skipping heatmap.")
         return
 
-    df = add_time_bins(df)
-
-    df["score_bucket"] = pd.cut(
-        df["score_diff"],
-        bins=[-20, -6, -3, 0, 3, 6, 20],
-        labels=["Home -7+", "Home -4 to -6", "Home -1 to -3",
-                "Tied", "Home +1 to +3", "Home +4+"],
+    # Right-closed score buckets, same edges/labels as pd.cut would use
+    score_diff = df["score_diff"].to_numpy()
+    s_codes = np.searchsorted(SCORE_BUCKET_EDGES, score_diff, side="left") - 1
+    n_score = len(SCORE_BUCKET_LABELS)
+    s_valid = (s_codes >= 0) & (s_codes < n_score)
+    s_codes = np.where(s_valid, s_codes, -1)
+    df["score_bucket"] = pd.Categorical.from_codes(
+        s_codes, categories=SCORE_BUCKET_LABELS, ordered=True
     )
 
-    pivot = pd.crosstab(df["score_bucket"], df["time_bin"])
+    # time_bin is already categorical; reuse its integer codes
+    time_labels = df["time_bin"].cat.categories
+    t_codes = df["time_bin"].cat.codes.to_numpy()
+
+    valid = s_valid & (t_codes >= 0)
+    counts = np.zeros((n_score, len(time_labels)), dtype=np.int32)
+    np.add.at(counts, (s_codes[valid], t_codes[valid]), 1)
 
-    plt.figure(figsize=(10, 6))
+    pivot = pd.DataFrame(
+        counts,
+        index=pd.Index(SCORE_BUCKET_LABELS, name="score_bucket"),
+        columns=pd.Index(time_labels, name="time_bin"),
+    )
+
+    ax = reset_axes(fig, (10, 6))
     sns.heatmap(
         pivot,
         annot=True,
         fmt="d",
         cmap="YlOrRd",
         cbar_kws={"label": "Number of Events"},
+        ax=ax,
     )
-    plt.title("Frequency of Game States (Score vs Time)")
-    plt.xlabel("Time Bin")
-    plt.ylabel("Score Bucket (home - away)")
-    plt.tight_layout()
-    plt.savefig(os.path.join(FIGURES_DIR, "game_state_heatmap.png"), dpi=300)
-    plt.close()
+    ax.set_title("Frequency of Game States (Score vs Time)")
+    ax.set_xlabel("Time Bin")
+    ax.set_ylabel("Score Bucket (home - away)")
+    save_figure(fig, "game_state_heatmap.png")
 
     print("\nMost common game states (top 5):")
-    flat = []
-    for score in pivot.index:
-        for t in pivot.columns:
-            flat.append((score, t, pivot.loc[score, t]))
-    flat_sorted = sorted(flat, key=lambda x: x[2], reverse=True)
-    for row in flat_sorted[:5]:
-        print(f"  - {row[0]} with {row[1]} remaining: {row[2]} events")
+    flat = pivot.to_numpy().ravel()
+    # Stable descending sort keeps ties in row-major order; the grid is
+    # only 36 cells, so a full sort is cheap
+    top_idx = np.argsort(-flat, kind="stable")[:5]
+    rows, cols = np.unravel_index(top_idx, pivot.shape)
+    for r, c, n in zip(rows, cols, flat[top_idx]):
+        print(f"  - {pivot.index[r]} with {pivot.columns[c]} remaining: {n} events")
 
 
 # ---------------------------------------------------------------------
@@ -282,7 +329,7 @@ def heatmap_game_states(df: pd.DataFrame) -> None:
 # ---------------------------------------------------------------------
 
 
-def team_clutch_activity(df: pd.DataFrame) -> None:
+def team_clutch_activity(df: pd.DataFrame, fig: plt.Figure) -> None:
     """
     Simple measure: teams that appear most often in clutch events.
     Relies on MATCHUP column from LeagueGameFinder output.
@@ -296,10 +343,27 @@ def team_clutch_activity(df: pd.DataFrame) -> None:
         return
 
     # MATCHUP examples: "LAL @ BOS", "BOS vs. LAL"
-    home = df["MATCHUP"].str.extract(r"^([A-Z]{2,3})\s")[0]
-    away = df["MATCHUP"].str.extract(r"\s([A-Z]{2,3})$")[0]
+    # Count events per matchup first, so the split runs once per unique
+    # matchup string rather than once per event.
+    matchup_counts = df["MATCHUP"].value_counts()
+    parts = matchup_counts.index.to_series().str.split(
+        r"\s(?:@|vs\.?)\s", n=1, regex=True, expand=True
+    )
 
-    counts = pd.concat([home, away], ignore_index=True).value_counts()
+    if parts.shape[1] < 2:
+        counts = pd.Series(dtype="int64")
+    else:
+        counts = (
+            pd.concat(
+                [
+                    matchup_counts.groupby(parts[0]).sum(),
+                    matchup_counts.groupby(parts[1]).sum(),
+                ]
+            )
+            .groupby(level=0)
+            .sum()
+            .sort_values(ascending=False)
+        )
 
     if counts.empty:
         print("Could not parse team abbreviations from MATCHUP; skipping.")
@@ -307,14 +371,12 @@ def team_clutch_activity(df: pd.DataFrame) -> None:
 
     top10 = counts.head(10)
 
-    plt.figure(figsize=(10, 5))
-    top10.plot(kind="bar")
-    plt.title("Top 10 Teams by Number of Clutch Events")
-    plt.xlabel("Team")
-    plt.ylabel("Number of Events")
-    plt.tight_layout()
-    plt.savefig(os.path.join(FIGURES_DIR, "team_clutch_activity.png"), dpi=300)
-    plt.close()
+    ax = reset_axes(fig, (10, 5))
+    top10.plot(kind="bar", ax=ax)
+    ax.set_title("Top 10 Teams by Number of Clutch Events")
+    ax.set_xlabel("Team")
+    ax.set_ylabel("Number of Events")
+    save_figure(fig, "team_clutch_activity.png")
 
     print("\nTop 5 teams:")
     print(top10.head(5))
@@ -325,7 +387,7 @@ def team_clutch_activity(df: pd.DataFrame) -> None:
 # ---------------------------------------------------------------------
 
 
-def event_type_distribution(df: pd.DataFrame) -> None:
+def event_type_distribution(df: pd.DataFrame, fig: plt.Figure) -> None:
     """
     Distribution of actionType in clutch time (shot, rebound, foul, etc.).
     """
@@ -337,16 +399,14 @@ def event_type_distribution(df: pd.DataFrame) -> None:
         print("actionType column not found; skipping event type analysis.")
         return
 
-    counts = df["actionType"].value_counts()
+    counts = df["actionType"].astype("category").value_counts()
 
-    plt.figure(figsize=(10, 6))
-    counts.head(10).plot(kind="barh")
-    plt.gca().invert_yaxis()
-    plt.title("Top 10 Event Types in Last 3 Minutes + OT")
-    plt.xlabel("Count")
-    plt.tight_layout()
-    plt.savefig(os.path.join(FIGURES_DIR, "event_type_distribution.png"), dpi=300)
-    plt.close()
+    ax = reset_axes(fig, (10, 6))
+    counts.head(10).plot(kind="barh", ax=ax)
+    ax.invert_yaxis()
+    ax.set_title("Top 10 Event Types in Last 3 Minutes + OT")
+    ax.set_xlabel("Count")
+    save_figure(fig, "event_type_distribution.png")
 
     print("\nEvent type counts (top 10):")
     print(counts.head(10))
@@ -422,7 +482,7 @@ Notes
 # ---------------------------------------------------------------------
 
 
-def main() -> None:
+def main(dpi: int = FIGURE_DPI) -> None:
     print("\n====================================")
     print("NBA LAST 3 MINUTES - EDA (liveData v3)")
     print("====================================\n")
@@ -436,11 +496,16 @@ def main() -> None:
     basic_overview(df)
     df = add_time_bins(df)
 
-    temporal_analysis(df)
-    shot_selection_analysis(df)
-    heatmap_game_states(df)
-    team_clutch_activity(df)
-    event_type_distribution(df)
+    # One Figure for every plot; each analysis clears and resizes it
+    fig = plt.figure(figsize=(10, 5), dpi=dpi)
+    try:
+        temporal_analysis(df, fig)
+        shot_selection_analysis(df, fig)
+        heatmap_game_states(df, fig)
+        team_clutch_activity(df, fig)
+        event_type_distribution(df, fig)
+    finally:
+        plt.close(fig)
 
     save_processed_data(df)
     generate_eda_report(df)
@@ -449,4 +514,11 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--dpi",
+        type=int,
+        default=FIGURE_DPI,
+        help=f"resolution of saved figures (default: {FIGURE_DPI})",
+    )
+    main(dpi=parser.parse_args().dpi)
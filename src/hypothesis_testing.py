@@ -10,44 +10,394 @@ All tests are based on REAL NBA liveData play-by-play events
 (last 3 minutes of 4Q + all overtimes).
 """
 
-import os
-import warnings
+import math
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
 import numpy as np
 import pandas as pd
-from scipy import stats
-from statsmodels.stats.proportion import proportions_ztest
+import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import feather
+from scipy import special
 
-warnings.filterwarnings("ignore")
+try:
+    from numba import njit
 
-PROCESSED_DIR = "data/processed"
-FIGURES_DIR = "figures"
+    HAS_NUMBA = True
+except ImportError:  # optional speedup for the fused statistics pass
+    HAS_NUMBA = False
+
+PROCESSED_DIR = Path("data/processed")
+FIGURES_DIR = Path("figures")
 ALPHA = 0.05  # significance level
 
+# Explicit dtypes for the columns the tests actually touch
+CSV_DTYPES = {
+    "actionType": "category",
+    "shotType": "category",
+    "shotResult": "category",
+}
+
+# time_remaining is whole seconds (<= 300 in overtime) and a late-game
+# score_diff stays well inside int8, so the filter columns are narrowed
+# to 2 and 1 bytes wide -- but only after checking the values fit, since
+# a plain astype would wrap out-of-range values silently.
+NARROW_INT_DTYPES = {"time_remaining": "int16", "score_diff": "int8"}
+
+SHOT_ACTIONS = ["shot", "freethrow", "freeThrow"]
+
+# H1 shot category codes; free throws are coded -1 and excluded
+SHOT_CATEGORIES = ["2PT", "3PT"]
+H1_COLUMNS = {
+    "time_remaining", "score_diff", "actionType", "shotType", "shotResult"
+}
+
+# Right-closed score_diff buckets (same edges/labels as the EDA script)
+SCORE_BUCKET_EDGES = np.array([-20, -6, -3, 0, 3, 6, 20])
+SCORE_BUCKET_LABELS = [
+    "Home -7+",
+    "Home -4 to -6",
+    "Home -1 to -3",
+    "Tied",
+    "Home +1 to +3",
+    "Home +4+",
+]
+
 
 # ---------------------------------------------------------------------
 # Utility
 # ---------------------------------------------------------------------
 
 
+def _mtime(path: Path) -> float | None:
+    """Modification time of ``path``, or None if it does not exist."""
+    try:
+        return path.stat().st_mtime
+    except FileNotFoundError:
+        return None
+
+
+def category_labels(col: pd.Series) -> pa.Array:
+    """
+    Category labels of ``col`` as an Arrow string array, so label
+    normalisation runs through pyarrow.compute kernels.
+    """
+    return pa.array(col.cat.categories.astype(str), type=pa.string())
+
+
+def _sort_by_action(df: pd.DataFrame) -> tuple[pd.DataFrame, np.ndarray]:
+    """
+    Order rows by actionType category code (stable) and return them with
+    the offsets where each code's run starts, so rows of one action type
+    are the contiguous slice offsets[c]:offsets[c + 1]. Already-sorted
+    frames (e.g. from the Feather cache) are returned as-is.
+    """
+    codes = df["actionType"].cat.codes.to_numpy()
+    if np.any(codes[1:] < codes[:-1]):
+        order = np.argsort(codes, kind="stable")
+        df = df.take(order).reset_index(drop=True)
+        codes = codes[order]
+    n_codes = len(df["actionType"].cat.categories)
+    return df, np.searchsorted(codes, np.arange(n_codes + 1))
+
+
+def _narrow_ints(df: pd.DataFrame) -> None:
+    """
+    Downcast the NARROW_INT_DTYPES columns in place where every value fits;
+    columns with nulls or out-of-range values keep their parsed width.
+    """
+    for col, dtype in NARROW_INT_DTYPES.items():
+        if col not in df or not pd.api.types.is_integer_dtype(df[col]):
+            continue
+        values = df[col].to_numpy()
+        info = np.iinfo(dtype)
+        if len(values) and (values.min() < info.min or values.max() > info.max):
+            continue
+        df[col] = values.astype(dtype)
+
+
 def load_processed_data() -> pd.DataFrame | None:
     """
     Load processed_critical_moments.csv created by the EDA script.
+
+    The CSV is parsed once with the multi-threaded PyArrow reader and cached
+    as an uncompressed Feather (Arrow IPC) sibling; later runs memory-map
+    that file unless the CSV has been regenerated since, so columns the
+    tests never touch are never paged in. actionType, shotType and
+    shotResult are returned as categories and rows are ordered by
+    actionType code (see ``_sort_by_action``).
     """
-    path = os.path.join(PROCESSED_DIR, "processed_critical_moments.csv")
-    if not os.path.exists(path):
-        print("processed_critical_moments.csv not found.")
-        print("Please run exploratory_data_analysis.py first.")
-        return None
+    path = PROCESSED_DIR / "processed_critical_moments.csv"
+    feather_path = path.with_suffix(".feather")
+    csv_mtime = _mtime(path)
+    feather_mtime = _mtime(feather_path)
 
-    df = pd.read_csv(path)
-    print(f"Loaded {len(df)} critical events from {path}")
+    cache_hit = feather_mtime is not None and (
+        csv_mtime is None or feather_mtime >= csv_mtime
+    )
+    if cache_hit:
+        table = feather.read_table(feather_path, memory_map=True)
+        df = table.to_pandas(split_blocks=True, self_destruct=True)
+        source = feather_path
+    else:
+        try:
+            df = pd.read_csv(path, engine="pyarrow", dtype=CSV_DTYPES)
+        except FileNotFoundError:
+            print("processed_critical_moments.csv not found.")
+            print("Please run exploratory_data_analysis.py first.")
+            return None
+        _narrow_ints(df)
+        source = path
+
+    for col in ("actionType", "shotType", "shotResult"):
+        if col in df:
+            df[col] = df[col].astype("category")
+
+    if "actionType" in df:
+        df, _ = _sort_by_action(df)
+
+    if not cache_hit:
+        feather.write_feather(df, feather_path, compression="uncompressed")
+
+    print(f"Loaded {len(df)} critical events from {source}")
     return df
 
 
+def foul_flags(action_type: pd.Series) -> np.ndarray:
+    """
+    uint8 foul indicator per event, matching "foul" case-insensitively
+    via the actionType category codes.
+    """
+    labels = pc.utf8_lower(category_labels(action_type))
+    foul_codes = np.flatnonzero(
+        pc.equal(labels, "foul").to_numpy(zero_copy_only=False)
+    )
+    return np.isin(action_type.cat.codes.to_numpy(), foul_codes).view(np.uint8)
+
+
 def ensure_figures_dir() -> None:
-    if not os.path.exists(FIGURES_DIR):
-        os.makedirs(FIGURES_DIR, exist_ok=True)
+    FIGURES_DIR.mkdir(parents=True, exist_ok=True)
+
+
+class OutputBuffer:
+    """
+    Collects print-style status lines and writes them to stdout in one
+    call, so each hypothesis emits its block with a single write.
+    """
+
+    def __init__(self) -> None:
+        self.lines: list[str] = []
+
+    def print(self, *values: object) -> None:
+        self.lines.append(" ".join(str(v) for v in values))
+
+    def flush(self) -> None:
+        if self.lines:
+            sys.stdout.write("\n".join(self.lines) + "\n")
+            self.lines.clear()
+
+
+def two_proportion_ztest(
+    count_a: int, nobs_a: int, count_b: int, nobs_b: int
+) -> tuple[float, float]:
+    """
+    Pooled two-sided z-test for two proportions, equivalent to
+    statsmodels' ``proportions_ztest([count_a, count_b], [nobs_a, nobs_b])``.
+    """
+    pooled = (count_a + count_b) / (nobs_a + nobs_b)
+    se = math.sqrt(pooled * (1 - pooled) * (1 / nobs_a + 1 / nobs_b))
+    if se == 0.0:
+        # pooled is 0 or 1, so both proportions are equal: nothing to test
+        return math.nan, math.nan
+    z_stat = float(count_a / nobs_a - count_b / nobs_b) / se
+    return z_stat, math.erfc(abs(z_stat) / math.sqrt(2))
+
+
+def chi2_independence(observed: np.ndarray) -> tuple[float, float, int]:
+    """
+    Pearson chi-square test of independence, matching
+    ``scipy.stats.chi2_contingency`` (including Yates' correction for 1 dof)
+    without its validation and unused outputs.
+    """
+    observed = observed.astype(np.float64)
+    expected = (
+        observed.sum(axis=1, keepdims=True)
+        * observed.sum(axis=0, keepdims=True)
+        / observed.sum()
+    )
+    dof = (observed.shape[0] - 1) * (observed.shape[1] - 1)
+    if dof == 1:
+        diff = expected - observed
+        observed = observed + np.sign(diff) * np.minimum(0.5, np.abs(diff))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        chi2 = float(((observed - expected) ** 2 / expected).sum())
+    return chi2, float(special.chdtrc(dof, chi2)), dof
+
+
+# ---------------------------------------------------------------------
+# Fused statistics pass
+# ---------------------------------------------------------------------
+
+
+def shot_codes(
+    df: pd.DataFrame, shot_rows: list[slice]
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Per-event int8 shot category and made flag for the fused pass.
+
+    ``shot_rows`` are the contiguous row ranges of the shot action types
+    (from ``_sort_by_action``). Category codes: -2 = not a shot
+    action, -1 = free throw, 0 = 2PT, 1 = 3PT (indices into
+    SHOT_CATEGORIES).
+    """
+    shot_cat = np.full(len(df), -2, dtype=np.int8)
+    made = np.zeros(len(df), dtype=np.int8)
+    if "shotType" not in df or "shotResult" not in df:
+        return shot_cat, made
+
+    # Classify the (few) category labels once and map only the shot rows
+    # by code. Each lookup table has a trailing entry so a missing value
+    # (code -1) behaves like an empty label. The free-throw match is
+    # case-insensitive: the original row-wise check looked for lowercase
+    # "free" in the upper-cased shotType and so never fired, leaving such
+    # shots in 2PT unless actionType was "freethrow".
+    st = df["shotType"].cat
+    st_labels = pc.utf8_upper(category_labels(df["shotType"]))
+    kind_table = np.where(
+        pc.match_substring(st_labels, "3").to_numpy(zero_copy_only=False),
+        1,
+        np.where(
+            pc.match_substring(st_labels, "FREE").to_numpy(zero_copy_only=False),
+            -1,
+            0,
+        ),
+    )
+    kind_table = np.append(kind_table, 0).astype(np.int8)
+    st_codes = st.codes.to_numpy()
+
+    sr = df["shotResult"].cat
+    made_labels = pc.equal(
+        pc.utf8_capitalize(category_labels(df["shotResult"])), "Made"
+    )
+    made_table = np.append(made_labels.to_numpy(zero_copy_only=False), False)
+    sr_codes = sr.codes.to_numpy()
+
+    at = df["actionType"].cat
+    at_codes = at.codes.to_numpy()
+    ft_labels = pc.equal(
+        pc.utf8_lower(category_labels(df["actionType"])), "freethrow"
+    ).to_numpy(zero_copy_only=False)
+
+    for rows in shot_rows:
+        if rows.start == rows.stop:
+            continue
+        # One action type per slice, so the free-throw test is a scalar
+        is_ft_action = ft_labels[at_codes[rows.start]]
+        kind = kind_table[st_codes[rows]]
+        made[rows] = made_table[sr_codes[rows]]
+        shot_cat[rows] = np.where(
+            kind == 1, 1, np.where(is_ft_action | (kind == -1), -1, 0)
+        )
+    return shot_cat, made
+
+
+if HAS_NUMBA:
+
+    @njit(cache=True)
+    def _fused_stats_kernel(tr, sd, is_foul, shot_cat, made, edges):
+        """
+        One pass over the events accumulating the H1 made/attempt counts,
+        the H2 window foul counts and the H3 bucket x foul table.
+        """
+        h1_sums = np.zeros(2, np.int64)
+        h1_counts = np.zeros(2, np.int64)
+        h1_events = 0
+        windows = np.zeros(4, np.int64)
+        table = np.zeros((edges.size - 1, 2), np.int64)
+        for i in range(tr.size):
+            f = is_foul[i]
+            t = tr[i]
+            d = sd[i]
+            if t <= 30:
+                windows[0] += f
+                windows[1] += 1
+                if d <= -3 and shot_cat[i] >= -1:
+                    h1_events += 1
+                    c = shot_cat[i]
+                    if c >= 0:
+                        h1_sums[c] += made[i]
+                        h1_counts[c] += 1
+            elif t <= 180:
+                windows[2] += f
+                windows[3] += 1
+            # Right-closed bucket search, inlined
+            if edges[0] < d <= edges[-1]:
+                b = 0
+                while d > edges[b + 1]:
+                    b += 1
+                table[b, f] += 1
+        return h1_sums, h1_counts, h1_events, windows, table
+
+
+def _fused_stats_numpy(tr, sd, is_foul, shot_cat, made, edges):
+    mask_30 = tr <= 30
+    mask_180 = (tr > 30) & (tr <= 180)
+    windows = np.array(
+        [
+            is_foul[mask_30].sum(),
+            mask_30.sum(),
+            is_foul[mask_180].sum(),
+            mask_180.sum(),
+        ],
+        dtype=np.int64,
+    )
+
+    # home - away <= -3 (home down by 3+)
+    h1 = mask_30 & (sd <= -3) & (shot_cat >= -1)
+    cat = shot_cat[h1]
+    keep = cat >= 0
+    h1_sums = np.bincount(cat[keep], weights=made[h1][keep], minlength=2)
+    h1_counts = np.bincount(cat[keep], minlength=2)
+
+    # bucket x is_foul counts from a single bincount on packed
+    # (bucket << 1) | is_foul keys
+    n_buckets = edges.size - 1
+    buckets = np.searchsorted(edges, sd, side="left") - 1
+    valid = (buckets >= 0) & (buckets < n_buckets)
+    key = (buckets[valid].astype(np.int32) << 1) | is_foul[valid].astype(
+        np.int32
+    )
+    table = np.bincount(key, minlength=n_buckets * 2).reshape(n_buckets, 2)
+
+    return (
+        h1_sums.astype(np.int64), h1_counts, int(h1.sum()), windows, table
+    )
+
+
+def fused_stats(
+    tr: np.ndarray,
+    sd: np.ndarray,
+    is_foul: np.ndarray,
+    shot_cat: np.ndarray,
+    made: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, int, np.ndarray, np.ndarray]:
+    """
+    Sufficient statistics for all three hypotheses from one scan of the
+    time_remaining / score_diff / foul / shot arrays.
+
+    Returns (h1_sums, h1_counts, h1_events, windows, table) where
+    h1_sums / h1_counts are indexed like SHOT_CATEGORIES, h1_events counts
+    every comeback shot action (free throws included), windows is
+    [fouls_a, total_a, fouls_b, total_b] and table is the score bucket x
+    is_foul contingency counts. Uses the numba kernel when available.
+    """
+    if HAS_NUMBA:
+        return _fused_stats_kernel(
+            tr, sd, is_foul, shot_cat, made, SCORE_BUCKET_EDGES
+        )
+    return _fused_stats_numpy(tr, sd, is_foul, shot_cat, made, SCORE_BUCKET_EDGES)
 
 
 # ---------------------------------------------------------------------
@@ -55,76 +405,57 @@ def ensure_figures_dir() -> None:
 # ---------------------------------------------------------------------
 
 
-def hypothesis_1_three_point_vs_two_point(df: pd.DataFrame) -> str:
+def hypothesis_1_three_point_vs_two_point(
+    sums: np.ndarray | None,
+    counts: np.ndarray | None,
+    n_events: int,
+    out: OutputBuffer,
+) -> str:
     """
     H1: In the last 30 seconds when the HOME team is trailing by 3+ points,
         do 3PT attempts have a different success rate than 2PT attempts?
 
     We only look at shot events and use shotResult == 'Made' as success.
+    ``sums`` / ``counts`` are the made shots and attempts per
+    SHOT_CATEGORIES from ``fused_stats``; None means a required column is
+    missing from the processed data.
     """
 
-    print("\n============================================================")
-    print("Hypothesis 1: 3PT vs 2PT in late-game comeback context")
-    print("============================================================")
+    out.print("\n============================================================")
+    out.print("Hypothesis 1: 3PT vs 2PT in late-game comeback context")
+    out.print("============================================================")
 
-    required_cols = {"time_remaining", "score_diff", "actionType"}
-    if not required_cols.issubset(df.columns):
-        print("Required columns missing; skipping Hypothesis 1.")
+    if sums is None or counts is None:
+        out.print("Required columns missing; skipping Hypothesis 1.")
         return "Hypothesis 1: SKIPPED (missing columns)"
 
-    # Filter for last 30 seconds, home trailing by 3+ points
-    late = df[
-        (df["time_remaining"] <= 30)
-        & (df["score_diff"] <= -3)  # home - away <= -3 (home down by 3+)
-        & (df["actionType"].isin(["shot", "freethrow", "freeThrow"]))
-    ].copy()
-
-    if late.empty:
-        print("No matching shot events for Hypothesis 1.")
+    if n_events == 0:
+        out.print("No matching shot events for Hypothesis 1.")
         return "Hypothesis 1: SKIPPED (no matching events)"
 
-    # Normalize fields
-    late["shotType"] = late.get("shotType", "").fillna("").astype(str).str.upper()
-    late["shotResult"] = (
-        late.get("shotResult", "").fillna("").astype(str).str.capitalize()
-    )
-
-    def categorize_shot(row) -> str:
-        t = row["shotType"]
-        a = row["actionType"].lower()
-        if "3" in t:
-            return "3PT"
-        if a in ["freethrow", "freethrow", "freeThrow"] or "free" in t:
-            return "FT"
-        return "2PT"
-
-    late["shot_category"] = late.apply(categorize_shot, axis=1)
-
     # Focus on 3PT vs 2PT only
-    late = late[late["shot_category"].isin(["3PT", "2PT"])].copy()
-    if late["shot_category"].nunique() < 2:
-        print("Not enough variation between 3PT and 2PT shots.")
+    if (counts > 0).sum() < 2:
+        out.print("Not enough variation between 3PT and 2PT shots.")
         return "Hypothesis 1: SKIPPED (need both 3PT and 2PT)"
 
-    late["made"] = (late["shotResult"] == "Made").astype(int)
-
     # Success rates
-    grouped = late.groupby("shot_category")["made"].agg(["mean", "sum", "count"])
-    print("\nSuccess rates (last 30s, home down by 3+):")
-    print(grouped)
-
-    # Extract groups for t-test
-    made_3pt = late[late["shot_category"] == "3PT"]["made"]
-    made_2pt = late[late["shot_category"] == "2PT"]["made"]
+    grouped = pd.DataFrame(
+        {"mean": sums / counts, "sum": sums, "count": counts},
+        index=pd.Index(SHOT_CATEGORIES, name="shot_category"),
+    )
+    out.print("\nSuccess rates (last 30s, home down by 3+):")
+    out.print(grouped)
 
-    if len(made_3pt) < 5 or len(made_2pt) < 5:
-        print("Sample sizes too small for a reliable t-test.")
+    # The sums and counts are sufficient statistics for the test
+    n_2pt, n_3pt = counts
+    if n_3pt < 5 or n_2pt < 5:
+        out.print("Sample sizes too small for a reliable z-test.")
         return "Hypothesis 1: INCONCLUSIVE (small sample)"
 
-    t_stat, p_val = stats.ttest_ind(made_3pt, made_2pt, equal_var=False)
+    z_stat, p_val = two_proportion_ztest(sums[1], n_3pt, sums[0], n_2pt)
 
-    print(f"\nTwo-sample t-test (3PT vs 2PT made rates):")
-    print(f"t-statistic = {t_stat:.4f}, p-value = {p_val:.4f}")
+    out.print(f"\nTwo-proportion z-test (3PT vs 2PT made rates):")
+    out.print(f"z-statistic = {z_stat:.4f}, p-value = {p_val:.4f}")
 
     if p_val < ALPHA:
         conclusion = (
@@ -137,7 +468,7 @@ def hypothesis_1_three_point_vs_two_point(df: pd.DataFrame) -> str:
             "between 3PT and 2PT success rates in this sample."
         )
 
-    print(conclusion)
+    out.print(conclusion)
     return f"Hypothesis 1: p={p_val:.4f} → {conclusion}"
 
 
@@ -146,55 +477,45 @@ def hypothesis_1_three_point_vs_two_point(df: pd.DataFrame) -> str:
 # ---------------------------------------------------------------------
 
 
-def hypothesis_2_foul_frequency(df: pd.DataFrame) -> str:
+def hypothesis_2_foul_frequency(
+    windows: np.ndarray | None, out: OutputBuffer
+) -> str:
     """
     H2: Are fouls more frequent in the final 30 seconds than in the
         earlier part of clutch time (30–180 seconds)?
 
-    We compare proportions of foul events among all events in two windows:
+    We compare proportions of foul events among all events in two windows,
+    given as [fouls_a, total_a, fouls_b, total_b] from ``fused_stats``:
       - Window A: time_remaining <= 30
       - Window B: 30 < time_remaining <= 180
     """
 
-    print("\n============================================================")
-    print("Hypothesis 2: Foul frequency in last 30 seconds")
-    print("============================================================")
+    out.print("\n============================================================")
+    out.print("Hypothesis 2: Foul frequency in last 30 seconds")
+    out.print("============================================================")
 
-    if "time_remaining" not in df.columns or "actionType" not in df.columns:
-        print("Required columns missing; skipping Hypothesis 2.")
+    if windows is None:
+        out.print("Required columns missing; skipping Hypothesis 2.")
         return "Hypothesis 2: SKIPPED (missing columns)"
 
-    # Tag foul events
-    df["is_foul"] = df["actionType"].astype(str).str.lower().eq("foul")
+    fouls_a, total_a, fouls_b, total_b = (int(v) for v in windows)
 
-    # Two time windows
-    window_a = df[df["time_remaining"] <= 30]
-    window_b = df[(df["time_remaining"] > 30) & (df["time_remaining"] <= 180)]
-
-    if window_a.empty or window_b.empty:
-        print("Not enough events in one or both windows.")
+    if total_a == 0 or total_b == 0:
+        out.print("Not enough events in one or both windows.")
         return "Hypothesis 2: SKIPPED (insufficient events)"
 
-    fouls_a = window_a["is_foul"].sum()
-    total_a = len(window_a)
-
-    fouls_b = window_b["is_foul"].sum()
-    total_b = len(window_b)
-
-    print(f"\nWindow A (<=30s): {fouls_a}/{total_a} fouls")
-    print(f"Window B (31–180s): {fouls_b}/{total_b} fouls")
+    out.print(f"\nWindow A (<=30s): {fouls_a}/{total_a} fouls")
+    out.print(f"Window B (31–180s): {fouls_b}/{total_b} fouls")
 
-    counts = np.array([fouls_a, fouls_b])
-    nobs = np.array([total_a, total_b])
-
-    if min(counts) == 0 or min(nobs - counts) == 0:
-        print("Some groups have zero fouls or zero non-fouls; z-test is unstable.")
+    non_fouls = min(total_a - fouls_a, total_b - fouls_b)
+    if min(fouls_a, fouls_b) == 0 or non_fouls == 0:
+        out.print("Some groups have zero fouls or zero non-fouls; z-test is unstable.")
         return "Hypothesis 2: INCONCLUSIVE (degenerate proportions)"
 
-    z_stat, p_val = proportions_ztest(counts, nobs)
+    z_stat, p_val = two_proportion_ztest(fouls_a, total_a, fouls_b, total_b)
 
-    print(f"\nProportions z-test:")
-    print(f"z-statistic = {z_stat:.4f}, p-value = {p_val:.4f}")
+    out.print(f"\nProportions z-test:")
+    out.print(f"z-statistic = {z_stat:.4f}, p-value = {p_val:.4f}")
 
     if p_val < ALPHA:
         conclusion = (
@@ -207,7 +528,7 @@ def hypothesis_2_foul_frequency(df: pd.DataFrame) -> str:
             "between final 30 seconds and earlier clutch time."
         )
 
-    print(conclusion)
+    out.print(conclusion)
     return f"Hypothesis 2: p={p_val:.4f} → {conclusion}"
 
 
@@ -216,50 +537,60 @@ def hypothesis_2_foul_frequency(df: pd.DataFrame) -> str:
 # ---------------------------------------------------------------------
 
 
-def hypothesis_3_score_diff_and_fouls(df: pd.DataFrame) -> str:
+def label_contingency(
+    observed: np.ndarray, rows: np.ndarray, cols: np.ndarray
+) -> pd.DataFrame:
+    """
+    Wrap the kept rows/columns of the bucket x is_foul counts in a
+    crosstab-style frame for printing.
+    """
+    return pd.DataFrame(
+        observed,
+        index=pd.Index(np.array(SCORE_BUCKET_LABELS)[rows], name="score_bucket"),
+        columns=pd.Index(np.array([False, True])[cols], name="is_foul"),
+    )
+
+
+def hypothesis_3_score_diff_and_fouls(
+    counts: np.ndarray | None, out: OutputBuffer
+) -> str:
     """
     H3: Does the score differential affect the likelihood of committing fouls?
 
     We group events into score buckets based on score_diff (home - away)
     and test if the proportion of fouls differs across buckets using
-    a chi-square test of independence.
+    a chi-square test of independence. ``counts`` is the bucket x is_foul
+    table from ``fused_stats``.
     """
 
-    print("\n============================================================")
-    print("Hypothesis 3: Score differential vs foul likelihood")
-    print("============================================================")
+    out.print("\n============================================================")
+    out.print("Hypothesis 3: Score differential vs foul likelihood")
+    out.print("============================================================")
 
-    if "score_diff" not in df.columns or "actionType" not in df.columns:
-        print("Required columns missing; skipping Hypothesis 3.")
+    if counts is None:
+        out.print("Required columns missing; skipping Hypothesis 3.")
         return "Hypothesis 3: SKIPPED (missing columns)"
 
-    df["is_foul"] = df["actionType"].astype(str).str.lower().eq("foul")
-
-    df["score_bucket"] = pd.cut(
-        df["score_diff"],
-        bins=[-20, -6, -3, 0, 3, 6, 20],
-        labels=["Home -7+", "Home -4 to -6", "Home -1 to -3",
-                "Tied", "Home +1 to +3", "Home +4+"],
-    )
-
-    valid = df.dropna(subset=["score_bucket"])
-    if valid.empty:
-        print("No valid score buckets; skipping.")
+    if counts.sum() == 0:
+        out.print("No valid score buckets; skipping.")
         return "Hypothesis 3: SKIPPED (no valid score buckets)"
 
-    contingency = pd.crosstab(valid["score_bucket"], valid["is_foul"])
+    # Like pd.crosstab, drop buckets / foul states that never occur
+    rows = counts.sum(axis=1) > 0
+    cols = counts.sum(axis=0) > 0
+    observed = counts[rows][:, cols]
 
-    if contingency.shape[0] < 2 or contingency.shape[1] < 2:
-        print("Not enough variation across buckets or foul status.")
+    if observed.shape[0] < 2 or observed.shape[1] < 2:
+        out.print("Not enough variation across buckets or foul status.")
         return "Hypothesis 3: INCONCLUSIVE (degenerate crosstab)"
 
-    chi2, p_val, dof, expected = stats.chi2_contingency(contingency)
+    chi2, p_val, dof = chi2_independence(observed)
 
-    print("\nContingency table (score_bucket x is_foul):")
-    print(contingency)
+    out.print("\nContingency table (score_bucket x is_foul):")
+    out.print(label_contingency(observed, rows, cols))
 
-    print(f"\nChi-square test:")
-    print(f"chi2 = {chi2:.4f}, dof = {dof}, p-value = {p_val:.4f}")
+    out.print(f"\nChi-square test:")
+    out.print(f"chi2 = {chi2:.4f}, dof = {dof}, p-value = {p_val:.4f}")
 
     if p_val < ALPHA:
         conclusion = (
@@ -271,7 +602,7 @@ def hypothesis_3_score_diff_and_fouls(df: pd.DataFrame) -> str:
             "dependence on the score differential bucket in this sample."
         )
 
-    print(conclusion)
+    out.print(conclusion)
     return f"Hypothesis 3: p={p_val:.4f} → {conclusion}"
 
 
@@ -285,7 +616,7 @@ def generate_hypothesis_report(results: list[str]) -> None:
     Save a text report summarizing hypothesis test outcomes.
     """
     ensure_figures_dir()
-    report_path = os.path.join(FIGURES_DIR, "hypothesis_testing_report.txt")
+    report_path = FIGURES_DIR / "hypothesis_testing_report.txt"
 
     header = """
 ============================================================
@@ -299,7 +630,7 @@ Summary of tests:
 
     content = header + "\n" + "\n".join(f"- {r}" for r in results) + "\n"
 
-    with open(report_path, "w") as f:
+    with open(report_path, "w", buffering=1 << 16) as f:
         f.write(content)
 
     print(f"\nHypothesis testing report saved to: {report_path}")
@@ -320,16 +651,64 @@ def main() -> None:
     if df is None or df.empty:
         return
 
-    results = []
-
-    r1 = hypothesis_1_three_point_vs_two_point(df)
-    results.append(r1)
+    if "actionType" in df:
+        # No-op for frames from load_processed_data, which are pre-sorted
+        df, offsets = _sort_by_action(df)
+
+    # Pull the filter columns out once and scan them in a single fused
+    # pass; a missing column is replaced by a neutral placeholder and the
+    # hypotheses that need it are skipped.
+    n = len(df)
+    columns = set(df.columns)
+    missing = np.full(n, np.nan)
+    tr = df["time_remaining"].to_numpy() if "time_remaining" in df else missing
+    sd = df["score_diff"].to_numpy() if "score_diff" in df else missing
+
+    if "actionType" in df:
+        at = df["actionType"]
+        is_foul = foul_flags(at)
+        shot_rows = [
+            slice(offsets[c], offsets[c + 1])
+            for c in np.flatnonzero(at.cat.categories.isin(SHOT_ACTIONS))
+        ]
+        shot_cat, made = shot_codes(df, shot_rows)
+    else:
+        is_foul = np.zeros(n, dtype=np.uint8)
+        shot_cat = np.full(n, -2, dtype=np.int8)
+        made = np.zeros(n, dtype=np.int8)
 
-    r2 = hypothesis_2_foul_frequency(df)
-    results.append(r2)
+    h1_sums, h1_counts, h1_events, windows, table = fused_stats(
+        tr, sd, is_foul, shot_cat, made
+    )
 
-    r3 = hypothesis_3_score_diff_and_fouls(df)
-    results.append(r3)
+    h1_ok = H1_COLUMNS <= columns
+    h2_ok = {"time_remaining", "actionType"} <= columns
+    h3_ok = {"score_diff", "actionType"} <= columns
+
+    # The tests only read the shared statistics, so they can run side by
+    # side; each buffers its own output and is flushed in order.
+    outs = [OutputBuffer() for _ in range(3)]
+    with ThreadPoolExecutor(max_workers=3) as ex:
+        futures = [
+            ex.submit(
+                hypothesis_1_three_point_vs_two_point,
+                h1_sums if h1_ok else None,
+                h1_counts if h1_ok else None,
+                h1_events,
+                outs[0],
+            ),
+            ex.submit(
+                hypothesis_2_foul_frequency, windows if h2_ok else None, outs[1]
+            ),
+            ex.submit(
+                hypothesis_3_score_diff_and_fouls, table if h3_ok else None, outs[2]
+            ),
+        ]
+
+        results = []
+        for future, out in zip(futures, outs):
+            results.append(future.result())
+            out.flush()
 
     generate_hypothesis_report(results)
 